@@ -1,17 +1,50 @@
 import argparse
-from collections import defaultdict
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import json
+import mmap
 import os
 from pathlib import Path
+import re
+import sys
 from typing import Dict, List, Tuple, Union
 
-import numpy as np
 import pandas as pd
 
+# Matches the start of a PARAMETER or SET block at the beginning of a line;
+# the word boundary keeps tokens like SETTLEMENT at column 0 inside a block
+# body from being mistaken for a header
+_BLOCK_RE = re.compile(rb"^(PARAMETER|SET)\b", re.MULTILINE)
+
+# Matches one word of a SET element line, i.e. a maximal run of quoted
+# segments and unquoted characters not containing a space
+_SET_WORD_RE = re.compile(r"(?:'[^']*'|[^' ]+)+")
+
+
+def _parse_set_element(line: str) -> Tuple[str, ...]:
+    """
+    Tokenize one SET element line into a tuple of .-separated attributes,
+    optionally followed by a trailing text element. Splits the line into words
+    on spaces outside quotes, then drops the quotes; a single pass in the
+    regex engine rather than a Python loop over the quote-split segments.
+    """
+    words = [m.group().replace("'", "") for m in _SET_WORD_RE.finditer(line)]
+    # Region codes, process names etc. repeat across millions of elements;
+    # interning them collapses the copies and makes comparisons and hashing
+    # during dedupe pointer-fast.
+    attributes = [sys.intern(a) for a in words[0].split(".")]
+    if len(words) == 1:
+        return tuple(attributes)
+    elif len(words) == 2:
+        return tuple([*attributes, words[1]])
+    else:
+        raise ValueError(f"Unexpected number of spaces in set value setting: {line}")
+
 
 def parse_parameter_values_from_file(
     path: Path,
-) -> Tuple[Dict[str, List], Dict[str, set]]:
+) -> Tuple[Dict[str, List], Dict[str, List]]:
     """
     Parse *.dd to turn it into CSV format
     There are parameters and sets, and each has a slightly different format
@@ -33,90 +66,107 @@ def parse_parameter_values_from_file(
 
     """
 
-    data = list(open(path, "r"))
-    data = [line.rstrip() for line in data]
-
     param_value_dict: Dict[str, List] = dict()
-    set_data_dict: Dict[str, set] = dict()
-    index = 0
-    while index < len(data):
-        if data[index].startswith("PARAMETER"):
-            # We expect the parameter name on the next line.
-            index += 1
-            while data[index].strip() == "":
-                index += 1
-
-            param_name = data[index].replace(
-                " ' '/", ""
-            )  # param_name is followed by this pattern
-
-            index += 1
-            param_data = []
-            # Parse values until a line with / is encountered.
-            while not data[index].startswith("/") and data[index] != "":
-                words = data[index].split(" ")
-
-                # Either "value" for a scalar, or "key value" for an array.
-                if len(words) == 1:
-                    attributes = []
-                elif len(words) == 2:
-                    attributes = words[0].split(".")
-                    attributes = [a if " " in a else a.strip("'") for a in attributes]
-                else:
-                    raise ValueError(
-                        f"Unexpected number of spaces in parameter value setting: {data[index]}"
-                    )
-
-                value = words[-1]
-                param_data.append([*attributes, value])
-
-                index += 1
-
-            param_value_dict[param_name] = param_data
-
-        if data[index].startswith("SET"):
-            # See https://www.gams.com/latest/docs/UG_SetDefinition.html
-            # This can only parse a subset of the allowed representations
-            _, name = data[index].split(" ")
-            index += 1
-            while data[index].strip() == "":
-                index += 1
-
-            assert data[index].startswith("/")
-            index += 1
-
-            set_data = set()
-            while not data[index].startswith("/") and data[index] != "":
-                parts = [[]]
-                for word in data[index].split("'"):
-                    if word != "":
-                        if word.isspace():
-                            parts.append([])
-                        elif word.endswith(" "):
-                            parts[-1].append(word.strip())
-                            parts.append([])
-                        else:
-                            parts[-1].append(word)
-                words = ["".join(part) for part in parts]
-                attributes = words[0].split(".")
-                if len(words) == 1:
-                    set_data.add(tuple([*attributes]))
-                elif len(words) == 2:
-                    text = words[1]
-                    set_data.add(tuple([*attributes, text]))
-                else:
-                    raise ValueError(
-                        f"Unexpected number of spaces in set value setting: {data[index]}"
-                    )
-
-                index += 1
-
-            if name in set_data_dict:
-                set_data_dict[name].update(set_data)
-            else:
-                set_data_dict[name] = set_data
+    set_data_dict: Dict[str, List] = dict()
 
-        index += 1
+    with open(path, "rb") as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # cannot mmap an empty file
+            return param_value_dict, set_data_dict
+
+    # Find all block starts in a single scan of the mapped file, then slice
+    # out and decode only the block bodies, instead of materializing the whole
+    # file as a list of str.
+    with buf:
+        for block in _BLOCK_RE.finditer(buf):
+            header_end = buf.find(b"\n", block.end())
+            if header_end == -1:
+                header_end = len(buf)
+            header = buf[block.start() : header_end].decode().rstrip()
+
+            if block.group(1) == b"PARAMETER":
+                # The block body runs until the next line starting with /
+                body_end = buf.find(b"\n/", header_end)
+                if body_end == -1:
+                    body_end = len(buf)
+                lines = [
+                    line.rstrip()
+                    for line in buf[header_end + 1 : body_end].decode().split("\n")
+                ]
+
+                # We expect the parameter name on the next non-empty line.
+                row = 0
+                while lines[row] == "":
+                    row += 1
+
+                param_name = lines[row].replace(
+                    " ' '/", ""
+                )  # param_name is followed by this pattern
+
+                # Values run until an empty line (the closing / cannot appear
+                # within the slice). Locate the end first so param_data can be
+                # allocated once instead of growing append by append.
+                start = row + 1
+                try:
+                    stop = lines.index("", start)
+                except ValueError:
+                    stop = len(lines)
+
+                param_data: List[tuple] = [()] * (stop - start)
+                for i, line in enumerate(lines[start:stop]):
+                    words = line.split(" ")
+
+                    # Either "value" for a scalar, or "key value" for an array.
+                    if len(words) == 1:
+                        param_data[i] = (words[0],)
+                    elif len(words) == 2:
+                        attributes = words[0].split(".")
+                        param_data[i] = (
+                            *(sys.intern(a.strip("'")) for a in attributes),
+                            words[1],
+                        )
+                    else:
+                        raise ValueError(
+                            f"Unexpected number of spaces in parameter value setting: {line}"
+                        )
+
+                param_value_dict[param_name] = param_data
+            else:
+                # See https://www.gams.com/latest/docs/UG_SetDefinition.html
+                # This can only parse a subset of the allowed representations
+                _, name = header.split(" ")
+
+                # The block opens with a / on the next non-empty line and
+                # closes with the next line starting with /
+                open_index = buf.find(b"\n/", header_end)
+                assert open_index != -1
+                assert buf[header_end : open_index + 1].strip() == b""
+                body_start = buf.find(b"\n", open_index + 1) + 1
+                body_end = buf.find(b"\n/", body_start - 1)
+                if body_end == -1:
+                    body_end = len(buf)
+                lines = [
+                    line.rstrip()
+                    for line in buf[body_start:body_end].decode().split("\n")
+                ]
+
+                # Collect elements in a list and dedupe once per file below,
+                # rather than hashing every element into a set as it is
+                # parsed; duplicates within a file are rare.
+                set_data = []
+                set_append = set_data.append
+                for line in lines:
+                    if line == "":
+                        break
+                    set_append(_parse_set_element(line))
+
+                set_data_dict.setdefault(name, []).extend(set_data)
+
+    # Dedupe each set once, preserving first-seen order.
+    set_data_dict = {
+        name: list(dict.fromkeys(elements)) for name, elements in set_data_dict.items()
+    }
 
     return param_value_dict, set_data_dict
 
@@ -142,19 +192,42 @@ def save_data_with_headers(
             raise ValueError(
                 f"Could not find mapping for {param_name} in mapping file."
             )
+        path = os.path.join(save_dir, param_name + ".csv")
+        if not param_data:
+            # Nothing to validate or format: just write the header line.
+            with open(path, "w") as f:
+                f.write(",".join(columns) + "\n")
+            continue
+        # Validate row widths and detect cells needing CSV quoting in a
+        # single pass over the data.
+        ncols = len(columns)
+        needs_quoting = False
         for row in param_data:
-            if len(row) != len(columns):
+            if len(row) != ncols:
                 raise ValueError(
-                    f"Mismatched number of columns for param {param_name} between data ({len(row)}) and mapping ({len(columns)})"
+                    f"Mismatched number of columns for param {param_name} between data ({len(row)}) and mapping ({ncols})"
                 )
-        df = pd.DataFrame(
-            data=np.asarray(param_data)[:, 0 : len(columns)], columns=columns
-        )
-        df.to_csv(os.path.join(save_dir, param_name + ".csv"), index=False)
+            if not needs_quoting:
+                needs_quoting = any('"' in cell or "," in cell for cell in row)
+        if needs_quoting:
+            # Rare case: cells need CSV quoting, so let pandas handle it.
+            # Rows are uniform tuples, which from_records consumes directly
+            # without an intermediate object-dtype matrix.
+            df = pd.DataFrame.from_records(param_data, columns=columns)
+            df.to_csv(path, index=False)
+        else:
+            # Common case: all cells are plain strings, so write the CSV
+            # directly and skip the per-cell dispatch of DataFrame.to_csv.
+            with open(path, "w", buffering=1 << 20) as f:
+                f.write(",".join(columns))
+                f.write("\n")
+                f.write("\n".join(",".join(row) for row in param_data))
+                f.write("\n")
 
     return
 
 
+@lru_cache
 def generate_headers_by_attr() -> Dict[str, List[str]]:
     with open("xl2times/config/times-info.json") as f:
         attributes = json.load(f)
@@ -167,26 +240,70 @@ def generate_headers_by_attr() -> Dict[str, List[str]]:
         else:
             headers_by_attr[attr["name"]] = attr["indexes"]
 
+    # The following will overwrite data obtained from times-info.json
+    # TODO: Remove once migration is done?
+    with open("xl2times/config/times_mapping.txt", "r") as f:
+        for line in f:
+            line = line.strip()
+            if line != "":
+                param_name, rest = line.split("[")
+                headers_by_attr[param_name] = rest.split("]")[0].split(",")
+
     return headers_by_attr
 
 
+def _find_dd_files(root: str):
+    """
+    Yield the paths of all .dd files under root. Walks with os.scandir, which
+    reuses the directory entries' stat information instead of constructing and
+    stat-ing a pathlib.Path per entry as Path.rglob does.
+    """
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".dd"):
+                    yield entry.path
+
+
 def convert_dd_to_tabular(
     basedir: str, output_dir: str, headers_by_attr: Dict[str, List[str]]
 ) -> None:
-    dd_files = [p for p in Path(basedir).rglob("*.dd")]
-
-    all_sets = defaultdict(list)
-    all_parameters = defaultdict(list)
-    for path in dd_files:
-        print(f"Processing path: {path}")
-        local_param_values, local_sets = parse_parameter_values_from_file(path)
-
-        # merge params from file into global collection
+    # Sort for a deterministic processing (and hence output) order
+    dd_files = sorted(Path(p) for p in _find_dd_files(basedir))
+
+    # Files are independent, so parse them in parallel; the per-file results
+    # are merged below on the main process.
+    with ProcessPoolExecutor() as executor:
+        results = []
+        for path, result in zip(
+            dd_files, executor.map(parse_parameter_values_from_file, dd_files)
+        ):
+            print(f"Processing path: {path}")
+            results.append(result)
+
+    # Presize each merged parameter list from the per-file counts and fill it
+    # by slice assignment, instead of paying list growth on every extend.
+    sizes: Counter = Counter()
+    for local_param_values, _ in results:
         for param, data in local_param_values.items():
-            all_parameters[param].extend(data)
+            sizes[param] += len(data)
+    all_parameters: Dict[str, List] = {
+        param: [None] * size for param, size in sizes.items()
+    }
+    offsets = dict.fromkeys(sizes, 0)
+    for local_param_values, _ in results:
+        for param, data in local_param_values.items():
+            start = offsets[param]
+            offsets[param] = end = start + len(data)
+            all_parameters[param][start:end] = data
 
+    all_sets: Dict[str, List] = {}
+    for _, local_sets in results:
         for set_name, data in local_sets.items():
-            all_sets[set_name].extend(data)
+            all_sets.setdefault(set_name, []).extend(data)
 
     use_subfolders = False
     if use_subfolders:
@@ -198,20 +315,8 @@ def convert_dd_to_tabular(
     os.makedirs(param_path, exist_ok=True)
     os.makedirs(set_path, exist_ok=True)
 
-    # Extract headers with key=param_name and value=List[attributes]
-    lines = list(open("xl2times/config/times_mapping.txt", "r"))
-    headers_data = headers_by_attr
-    # The following will overwrite data obtained from headers_by_attr
-    # TODO: Remove once migration is done?
-    for line in lines:
-        line = line.strip()
-        if line != "":
-            param_name = line.split("[")[0]
-            attributes = line.split("[")[1].split("]")[0].split(",")
-            headers_data[param_name] = [*attributes]
-
-    save_data_with_headers(all_parameters, headers_data, param_path)
-    save_data_with_headers(all_sets, headers_data, set_path)
+    save_data_with_headers(all_parameters, headers_by_attr, param_path)
+    save_data_with_headers(all_sets, headers_by_attr, set_path)
 
     return
 
@@ -1,9 +1,9 @@
 from collections import defaultdict
 from dataclasses import dataclass, field
+from functools import lru_cache
 from importlib import resources
 from itertools import chain
 import json
-import re
 from typing import Dict, Iterable, List, Set, Tuple
 from enum import Enum
 from pandas.core.frame import DataFrame
@@ -65,10 +65,15 @@ class Tag(str, Enum):
 
     @classmethod
     def has_tag(cls, tag):
-        return tag in cls._value2member_map_
+        return tag in _TAG_BY_VALUE
 
 
-@dataclass
+# Maps tag string values directly to members, bypassing the enum construction
+# machinery (missing-value lookup in Tag.__call__) in hot loops
+_TAG_BY_VALUE: Dict[str, Tag] = {tag.value: tag for tag in Tag}
+
+
+@dataclass(slots=True)
 class EmbeddedXlTable:
     """This class defines a table object as a pandas dataframe wrapped with some metadata.
 
@@ -93,26 +98,27 @@ class EmbeddedXlTable:
     def __eq__(self, o: object) -> bool:
         if not isinstance(o, EmbeddedXlTable):
             return False
-        return (
+        if not (
             self.tag == o.tag
             and self.uc_sets == o.uc_sets
             and self.range == o.range
             and self.filename == o.filename
             and self.dataframe.shape == o.dataframe.shape
-            and (
-                len(self.dataframe) == 0  # Empty tables don't affect our output
-                or self.dataframe.sort_index(axis=1).equals(
-                    o.dataframe.sort_index(axis=1)
-                )
-            )
-        )
+        ):
+            return False
+        if len(self.dataframe) == 0:  # Empty tables don't affect our output
+            return True
+        # Only pay for sorting the columns when their orders actually differ
+        if self.dataframe.columns.equals(o.dataframe.columns):
+            return self.dataframe.equals(o.dataframe)
+        return self.dataframe.sort_index(axis=1).equals(o.dataframe.sort_index(axis=1))
 
     def __str__(self) -> str:
         df_str = self.dataframe.to_csv(index=False, lineterminator="\n")
         return f"EmbeddedXlTable(tag={self.tag}, uc_sets={self.uc_sets}, sheetname={self.sheetname}, range={self.range}, filename={self.filename}, dataframe=\n{df_str}{self.dataframe.shape})"
 
 
-@dataclass
+@dataclass(slots=True)
 class TimesXlMap:
     """This class defines mapping data objects between the TIMES excel tables
     used by the tool for input and the transformed tables it outputs. The mappings
@@ -138,7 +144,7 @@ class TimesXlMap:
     filter_rows: Dict[str, str]
 
 
-@dataclass
+@dataclass(slots=True)
 class TimesModel:
     """
     This class contains all the information about the processed TIMES model.
@@ -218,7 +224,12 @@ class Config:
         self.times_xl_maps = list(name_to_map.values())
         self.filter_regions = Config._read_regions_filter(regions)
 
+    # The config files shipped with the package don't change within a
+    # process, so the parsing helpers below are cached to make repeated
+    # Config construction (e.g. in tests) cheap. Callers must not mutate
+    # the returned structures.
     @staticmethod
+    @lru_cache
     def _process_times_info(
         times_info_file: str,
     ) -> Tuple[Iterable[str], Set[str], List[TimesXlMap]]:
@@ -233,8 +244,8 @@ class Config:
         unknown_cats = {item["gams-cat"] for item in table_info} - set(categories)
         if unknown_cats:
             print(f"WARNING: Unknown categories in times-info.json: {unknown_cats}")
-        dd_table_order = chain.from_iterable(
-            (sorted(cat_to_tables[c]) for c in categories)
+        dd_table_order = tuple(
+            chain.from_iterable(sorted(cat_to_tables[c]) for c in categories)
         )
 
         # Compute the set of all attributes, i.e. all entities with category = parameter
@@ -271,6 +282,7 @@ class Config:
         return dd_table_order, attributes, param_mappings
 
     @staticmethod
+    @lru_cache
     def _read_mappings(filename: str) -> List[TimesXlMap]:
         """
         Function to load mappings from a text file between the excel sheets we use as input and
@@ -299,10 +311,8 @@ class Config:
                 if line == "":
                     break
                 (times, xl) = line.split(" = ")
-                (times_name, times_cols_str) = list(
-                    filter(None, re.split("\[|\]", times))
-                )
-                (xl_name, xl_cols_str) = list(filter(None, re.split("\(|\)", xl)))
+                (times_name, times_cols_str) = times.rstrip("]").split("[")
+                (xl_name, xl_cols_str) = xl.rstrip(")").split("(")
                 times_cols = times_cols_str.split(",")
                 xl_cols = xl_cols_str.split(",")
                 filter_rows = {}
@@ -342,6 +352,7 @@ class Config:
         return mappings
 
     @staticmethod
+    @lru_cache
     def _read_veda_tags_info(
         veda_tags_file: str,
     ) -> Tuple[
@@ -352,7 +363,7 @@ class Config:
     ]:
         def to_tag(s: str) -> Tag:
             # The file stores the tag name in lowercase, and without the ~
-            return Tag("~" + s.upper())
+            return _TAG_BY_VALUE["~" + s.upper()]
 
         # Read veda_tags_file
         with resources.open_text("xl2times.config", veda_tags_file) as f:
@@ -412,6 +423,7 @@ class Config:
         return valid_column_names, row_comment_chars, discard_if_empty, known_cols
 
     @staticmethod
+    @lru_cache
     def _read_veda_attr_defaults(
         veda_attr_defaults_file: str,
     ) -> Tuple[Dict[str, Dict[str, list]], Set[str]]: